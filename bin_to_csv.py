@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bin_to_csv.py
+
+Convert binary logs written by `mini_scale_logger.py --binary` to the CSV schema
+used by the default logger output.
+
+The record layout is defined by BIN_RECORD in log_format.py.
+
+Examples:
+    python bin_to_csv.py data/weight_data_scaleA_2025-08-05.bin
+    python bin_to_csv.py in.bin -o out.csv
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+from log_format import BIN_RECORD, X100_MISSING, format_cents
+
+
+# Records per read; keeps memory flat for large day files
+CHUNK_RECORDS = 4096
+CSV_HEADER = "Time,Weight_g,Weight_x100_g,RawADC\n"
+
+
+def iter_records(path: str):
+    """Yield (time_ns, weight_g, weight_x100, raw_adc) tuples; a truncated trailing record is ignored."""
+    chunk_bytes = BIN_RECORD.size * CHUNK_RECORDS
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_bytes)
+            usable = len(data) - (len(data) % BIN_RECORD.size)
+            if usable:
+                yield from BIN_RECORD.iter_unpack(memoryview(data)[:usable])
+            if len(data) < chunk_bytes:
+                break
+
+
+def ns_to_iso(ns: int) -> str:
+    secs, rem_ns = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(secs).replace(microsecond=rem_ns // 1000).isoformat()
+
+
+def convert(src: str, out) -> int:
+    out.write(CSV_HEADER)
+    n = 0
+    for ns, g_f32, x100, adc in iter_records(src):
+        s_x100 = format_cents(x100) if x100 != X100_MISSING else "nan"
+        out.write(f"{ns_to_iso(ns)},{g_f32:.3f},{s_x100},{adc}\n")
+        n += 1
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert binary MiniScale logs to CSV.")
+    parser.add_argument("src", help="Binary log file (.bin)")
+    parser.add_argument("-o", "--out", default=None,
+                        help="Output CSV path (default: same name with .csv; '-' for stdout)")
+    args = parser.parse_args()
+
+    if args.out == "-":
+        convert(args.src, sys.stdout)
+        return
+
+    out_path = args.out or os.path.splitext(args.src)[0] + ".csv"
+    with open(out_path, "w", newline="") as out:
+        n = convert(args.src, out)
+    print(f"Wrote {n} rows to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+log_format.py
+
+On-disk formats shared by mini_scale_logger.py and bin_to_csv.py.
+No hardware dependencies, so the converter runs anywhere.
+
+Binary record (24 bytes, little-endian, no header):
+    int64   Time as nanoseconds since the Unix epoch (local wall clock)
+    float32 Weight_g
+    int32   Weight_x100 (grams*100; X100_MISSING if the read failed)
+    int32   RawADC (-1 if the read failed)
+    4 bytes reserved (zero)
+"""
+
+import os
+import struct
+
+
+BIN_RECORD = struct.Struct("<qfii4x")
+X100_MISSING = -(1 << 31)  # int32 sentinel for a failed read
+
+
+def format_cents(c: int) -> str:
+    """Format an int weight*100 as grams with 2 decimals, without the float formatter."""
+    sign = "-" if c < 0 else ""
+    c = abs(c)
+    return f"{sign}{c // 100}.{c % 100:02d}"
+
+
+def trim_partial_record(path: str) -> int:
+    """
+    Truncate a binary log to a whole number of records (e.g. after a torn write
+    on power loss) so appended records stay aligned. Returns bytes removed.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+    extra = size % BIN_RECORD.size
+    if extra:
+        os.truncate(path, size - extra)
+    return extra
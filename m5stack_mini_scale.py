@@ -16,9 +16,12 @@ Requires:
 
 from __future__ import annotations
 
+import ctypes
 import struct
+import threading
+import time
 from typing import Optional, Tuple
-from smbus2 import SMBus
+from smbus2 import SMBus, i2c_msg
 
 
 # --------- I2C defs ----------
@@ -38,16 +41,31 @@ REG_FILTERS         = 0x80  # 3 bytes: lp_enabled, avg_level (0..50), ema_alpha
 REG_FW_VERSION      = 0xFE  # 1 byte (per M5 Arduino lib)
 REG_I2C_ADDRESS     = 0xFF  # 1 byte R/W (per M5 Arduino lib)
 
+# Precompiled little-endian codecs (avoid re-parsing the format string per sample)
+_F32 = struct.Struct("<f")
+_I32 = struct.Struct("<i")
+
 
 class MiniScale:
-    def __init__(self, bus: int = DEFAULT_BUS, addr: int = DEFAULT_ADDR):
+    def __init__(self, bus: int = DEFAULT_BUS, addr: int = DEFAULT_ADDR, use_rdwr: bool = False):
+        """
+        use_rdwr: read registers with one combined write+read (I2C_RDWR, repeated START)
+                  instead of SMBus block reads. Requires adapter support for I2C_RDWR.
+        """
         self.addr = int(addr)
+        self.use_rdwr = bool(use_rdwr)
         self._bus = SMBus(int(bus))
+        # smbus2 is not thread-safe; serialize transfers (e.g. logger + button thread)
+        self._lock = threading.Lock()
+        # Reused receive buffer for hot-path reads (max SMBus block is 32 bytes)
+        self._rxbuf = bytearray(32)
+        self._rxarr = (ctypes.c_char * len(self._rxbuf)).from_buffer(self._rxbuf)  # memmove target for I2C_RDWR
 
     # ---- context manager / cleanup ----
     def close(self):
         try:
-            self._bus.close()
+            with self._lock:
+                self._bus.close()
         except Exception:
             pass
 
@@ -58,33 +76,48 @@ class MiniScale:
         self.close()
 
     # ---- low-level helpers ----
+    def _read_rx(self, reg: int, n: int) -> bytearray:
+        """
+        Read n bytes into the shared self._rxbuf for struct.unpack_from(); caller must
+        hold self._lock. The returned buffer is valid only until the next read.
+        """
+        if self.use_rdwr:
+            w = i2c_msg.write(self.addr, [reg])
+            r = i2c_msg.read(self.addr, n)
+            self._bus.i2c_rdwr(w, r)
+            ctypes.memmove(self._rxarr, r.buf, n)
+        else:
+            self._rxbuf[:n] = self._bus.read_i2c_block_data(self.addr, reg, n)
+        return self._rxbuf
+
     def _read_block(self, reg: int, n: int) -> bytes:
-        data = self._bus.read_i2c_block_data(self.addr, reg, n)
-        return bytes(data)
+        with self._lock:
+            return bytes(memoryview(self._read_rx(reg, n))[:n])
 
     def _write_block(self, reg: int, data: bytes | list[int]) -> None:
-        if isinstance(data, bytes):
-            payload = list(data)
-        else:
-            payload = list(data)
-        self._bus.write_i2c_block_data(self.addr, reg, payload)
+        payload = list(data)
+        with self._lock:
+            self._bus.write_i2c_block_data(self.addr, reg, payload)
 
     # ---- core reads ----
     def get_raw_adc(self) -> int:
         """Raw ADC, int32 LE."""
-        b = self._read_block(REG_RAW_ADC, 4)
-        return int.from_bytes(b, "little", signed=True)
+        with self._lock:
+            return _I32.unpack_from(self._read_rx(REG_RAW_ADC, 4))[0]
 
     def get_weight_float(self) -> float:
         """Weight in grams as float32 from 0x10."""
-        b = self._read_block(REG_WEIGHT_F32, 4)
-        return struct.unpack("<f", b)[0]
+        with self._lock:
+            return _F32.unpack_from(self._read_rx(REG_WEIGHT_F32, 4))[0]
+
+    def get_weight_x100(self) -> int:
+        """Raw 0x60 value: int32 weight*100 (centigrams)."""
+        with self._lock:
+            return _I32.unpack_from(self._read_rx(REG_WEIGHT_X100_I32, 4))[0]
 
     def get_weight_int(self) -> float:
         """Weight in grams via 0x60 (int32 weight*100)."""
-        b = self._read_block(REG_WEIGHT_X100_I32, 4)
-        val = int.from_bytes(b, "little", signed=True)
-        return val / 100.0
+        return self.get_weight_x100() / 100.0
 
     def get_weight(self, prefer: str = "float") -> float:
         """
@@ -95,19 +128,50 @@ class MiniScale:
             return self.get_weight_int()
         return self.get_weight_float()
 
+    def read_sample_bundle(self) -> Tuple[int, float, int]:
+        """
+        Read raw ADC, float32 weight and int32 weight*100 in two block reads.
+        0x00..0x13 covers RAW_ADC and WEIGHT_F32 in one transfer; 0x60 is separate.
+        Returns (raw_adc, weight_f32_g, weight_x100) with weight_x100 undivided.
+        """
+        with self._lock:
+            buf = self._read_rx(REG_RAW_ADC, 20)
+            adc = _I32.unpack_from(buf, 0)[0]
+            gf = _F32.unpack_from(buf, REG_WEIGHT_F32 - REG_RAW_ADC)[0]
+            x100 = _I32.unpack_from(self._read_rx(REG_WEIGHT_X100_I32, 4))[0]
+        return adc, gf, x100
+
     # ---- tare / calibration (GAP) ----
     def tare(self) -> None:
         """Write 1 to 0x50 to reset offset on the unit."""
         self._write_block(REG_OFFSET_TARE, [1])
 
+    def wait_stable(self, timeout: float = 0.3, tol_x100: int = 2,
+                    zero_tol_x100: int = 50, poll: float = 0.01) -> bool:
+        """
+        Wait for a tare to take effect: poll 0x60 (weight*100, centigrams) every `poll` s
+        until two successive reads differ by <= tol_x100 and read within zero_tol_x100
+        of zero (defaults: 0.02 g step, 0.5 g from zero).
+        Returns True once settled, False if `timeout` expired first.
+        """
+        prev = None
+        t0 = time.monotonic()
+        while True:
+            x100 = self.get_weight_x100()
+            if prev is not None and abs(x100 - prev) <= tol_x100 and abs(x100) <= zero_tol_x100:
+                return True
+            prev = x100
+            if time.monotonic() - t0 > timeout:
+                return False
+            time.sleep(poll)
+
     def get_gap(self) -> float:
         """Read GAP (float32 LE) used by the device’s internal calibration."""
-        b = self._read_block(REG_GAP_F32, 4)
-        return struct.unpack("<f", b)[0]
+        return _F32.unpack(self._read_block(REG_GAP_F32, 4))[0]
 
     def set_gap(self, gap: float) -> None:
         """Set GAP (float32 LE) — ADC counts per gram."""
-        self._write_block(REG_GAP_F32, struct.pack("<f", float(gap)))
+        self._write_block(REG_GAP_F32, _F32.pack(float(gap)))
 
     @staticmethod
     def compute_gap_from_points(adc_0g: int, adc_w: int, weight_g: float) -> float:
@@ -119,6 +183,33 @@ class MiniScale:
             raise ValueError("weight_g must be non-zero")
         return (int(adc_0g) - int(adc_w)) / float(weight_g)
 
+    @staticmethod
+    def compute_gap_from_points_batch(adc_0g, adc_w, weight_g, mad_k: float = 3.0) -> float:
+        """
+        Least-squares GAP from many (adc_0g, adc_w, weight_g) triples (requires numpy).
+        Fits (adc_0g - adc_w) = GAP * weight_g through the origin, after dropping
+        points whose per-point GAP is more than mad_k scaled MADs from the median.
+        """
+        import numpy as np
+
+        adc0 = np.asarray(adc_0g, dtype=np.int64)
+        adcw = np.asarray(adc_w, dtype=np.int64)
+        w = np.asarray(weight_g, dtype=np.float64)
+        if adc0.size == 0 or not (adc0.shape == adcw.shape == w.shape):
+            raise ValueError("inputs must be non-empty and of equal length")
+        if np.any(w == 0):
+            raise ValueError("weight_g must be non-zero")
+
+        d = (adc0 - adcw).astype(np.float64)
+        gaps = d / w
+        med = np.median(gaps)
+        mad = 1.4826 * np.median(np.abs(gaps - med))
+        # Floor relative to |median| so float round-off does not reject points when MAD == 0
+        keep = np.abs(gaps - med) <= max(mad_k * mad, 1e-9 * abs(med))
+
+        gap, *_ = np.linalg.lstsq(w[keep][:, None], d[keep], rcond=None)
+        return float(gap[0])
+
     # ---- LED / button / filters ----
     def set_led(self, r: int, g: int, b: int) -> None:
         self._write_block(REG_LED_RGB, [r & 0xFF, g & 0xFF, b & 0xFF])
@@ -141,6 +232,13 @@ class MiniScale:
         avg_level : 0..50 (default 10)
         ema_alpha : 0..99 (default 10)
         """
+        # All fields given: nothing to preserve, skip the read
+        if lp_enabled is not None and avg_level is not None and ema_alpha is not None:
+            self._write_block(REG_FILTERS, [int(lp_enabled) & 0xFF,
+                                            int(avg_level) & 0xFF,
+                                            int(ema_alpha) & 0xFF])
+            return
+
         # Read current, modify, then write back to avoid clobbering other fields
         cur = list(self._read_block(REG_FILTERS, 3))
         if lp_enabled is not None:
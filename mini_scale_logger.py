@@ -4,6 +4,8 @@ mini_scale_logger.py
 
 Log weight from the M5Stack Unit MiniScale (U177, I2C 0x26) to daily CSV files.
 Uses the high-level helpers in m5stack_mini_scale.py (MiniScale).
+With --binary, daily .bin files with fixed 24-byte records are written instead
+(for high sample rates); convert them with bin_to_csv.py.
 
 CSV schema (one file per day, name tag optional):
     Time,Weight_g,Weight_x100_g,RawADC
@@ -15,18 +17,21 @@ Examples:
 
 Notes:
 - This logger always enables "tare on button press": if the Unit’s button is pressed,
-  it will call scale.tare() immediately (with debounce). This is independent of config.
+  it will call scale.tare() on the next sample (with debounce). This is independent of config.
+  The button is polled on a background thread so debounce waits do not stall logging.
 """
 
+import io
 import os
-import csv
 import time
 import json
 import argparse
 import signal
-from datetime import datetime
+import threading
+from datetime import date, datetime
 
 from m5stack_mini_scale import MiniScale, DEFAULT_ADDR, DEFAULT_BUS
+from log_format import BIN_RECORD, X100_MISSING, format_cents, trim_partial_record
 
 
 # --------------------
@@ -36,7 +41,10 @@ DEFAULTS = {
     "data_dir": "data",
     "bus": DEFAULT_BUS,
     "addr": hex(DEFAULT_ADDR),  # hex string or int
+    "i2c_rdwr": False,          # use combined I2C_RDWR write+read for register reads
     "interval": 1.0,            # seconds
+    "flush_interval": 5.0,      # seconds between flushes of buffered rows/records to disk
+    "binary": False,            # write fixed-size binary records instead of CSV
     "name": "",
     "print": False,
     "tare_on_start": False,     # recommended False for services; button-tare is always active
@@ -48,11 +56,14 @@ DEFAULTS = {
     "sign": 1.0                 # multiply final grams by this (use -1 if your unit reads negative)
 }
 
-# Button-tare debounce settings
-BTN_SAMPLE_SECS = 0.05    # polling period for the button inside the loop
-BTN_AFTER_TARE_SLEEP = 0.30  # short pause after tare
+# Button-tare debounce settings (button is polled on its own thread)
+BTN_SAMPLE_SECS = 0.05    # polling period for the button thread
+BTN_AFTER_TARE_SLEEP = 0.30  # short pause in the button thread after a press
 BTN_WAIT_RELEASE = True      # wait for button release before accepting another tare
 
+# Upper bound for the binary log's user-space write buffer
+BIN_BUFFER_BYTES = 1 << 20
+
 
 # ------------
 # Graceful exit
@@ -75,13 +86,13 @@ def ensure_dir(path: str) -> None:
 def sanitize_tag(tag: str) -> str:
     return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in (tag or ""))
 
-def today_path(data_dir: str, name: str) -> str:
-    day = datetime.now().strftime("%Y-%m-%d")
+def today_path(data_dir: str, name: str, day: date | None = None, ext: str = "csv") -> str:
+    day = (day or datetime.now().date()).strftime("%Y-%m-%d")
     tag = sanitize_tag(name)
-    base = f"weight_data_{tag + '_' if tag else ''}{day}.csv"
+    base = f"weight_data_{tag + '_' if tag else ''}{day}.{ext}"
     return os.path.join(data_dir, base)
 
-def ensure_header(fp, writer: csv.writer) -> None:
+def ensure_header(fp) -> None:
     fp.seek(0, os.SEEK_END)
     needs = fp.tell() == 0
     if not needs:
@@ -90,9 +101,54 @@ def ensure_header(fp, writer: csv.writer) -> None:
         needs = ("Time,Weight_g,Weight_x100_g,RawADC" not in first)
         fp.seek(0, os.SEEK_END)
     if needs:
-        writer.writerow(["Time", "Weight_g", "Weight_x100_g", "RawADC"])
+        fp.write("Time,Weight_g,Weight_x100_g,RawADC\n")
         fp.flush()
 
+def bin_buffer_size(interval: float, flush_interval: float) -> int:
+    """Buffer just large enough for one flush_interval worth of records (capped at BIN_BUFFER_BYTES)."""
+    records = int(flush_interval / max(interval, 1e-3)) + 1
+    return min(BIN_BUFFER_BYTES, max(io.DEFAULT_BUFFER_SIZE, records * BIN_RECORD.size))
+
+def open_log(path: str, binary: bool, buffer_bytes: int = BIN_BUFFER_BYTES):
+    if binary:
+        # Drop a torn trailing record so new records stay 24-byte aligned
+        dropped = trim_partial_record(path)
+        if dropped:
+            print(f"[WARN] dropped {dropped} trailing bytes of a partial record in {path}")
+        return open(path, "ab", buffering=buffer_bytes)
+    fp = open(path, "a+", newline="")
+    ensure_header(fp)
+    return fp
+
+def button_loop(scale: MiniScale, tare_requested: threading.Event, stop: threading.Event) -> None:
+    """
+    Poll the Unit's button every BTN_SAMPLE_SECS and set `tare_requested` on each press.
+    Runs on a daemon thread so debounce waits never stall weight logging; exits once `stop` is set.
+    """
+    prev_pressed = False
+    while not stop.is_set():
+        try:
+            pressed = scale.get_button_pressed()  # True if pressed
+        except Exception:
+            pressed = False
+
+        # Rising edge: pressed now, not pressed before
+        if pressed and not prev_pressed:
+            tare_requested.set()
+            stop.wait(BTN_AFTER_TARE_SLEEP)
+            if BTN_WAIT_RELEASE:
+                # Wait until user releases the button before allowing another tare
+                while not stop.is_set():
+                    try:
+                        if not scale.get_button_pressed():
+                            break
+                    except Exception:
+                        break
+                    stop.wait(BTN_SAMPLE_SECS)
+
+        prev_pressed = pressed
+        stop.wait(BTN_SAMPLE_SECS)
+
 def load_config(path: str | None) -> dict:
     if not path:
         return {}
@@ -134,6 +190,9 @@ def _coerce_int(v, default=0):
     except Exception:
         return default
 
+# --- fast row formatting ---
+_fmt3 = "{:.3f}".format
+
 
 # -------
 # Main
@@ -152,12 +211,18 @@ def main():
     parser.add_argument("--bus", type=int, default=_coerce_int(cfg.get("bus", 1)))
     parser.add_argument("--addr", default=cfg.get("addr", "0x26"), help="I2C address (e.g. 0x26)")
     parser.add_argument("--interval", type=float, default=float(cfg.get("interval", 1.0)))
+    parser.add_argument("--flush-interval", type=float, default=float(cfg.get("flush_interval", 5.0)),
+                        help="Seconds between flushes of buffered rows (CSV) or records (--binary) to disk.")
     parser.add_argument("--name", default=cfg.get("name", ""))
+    parser.add_argument("--binary", action="store_true", default=_coerce_bool(cfg.get("binary", False)),
+                        help="Write 24-byte binary records (.bin) instead of CSV; see bin_to_csv.py.")
 
     # booleans: default must be a real bool for action='store_true'
     parser.add_argument("--print", action="store_true", default=_coerce_bool(cfg.get("print", False)))
     parser.add_argument("--tare-on-start", action="store_true", default=_coerce_bool(cfg.get("tare_on_start", False)))
     parser.add_argument("--set-filters", action="store_true", default=_coerce_bool(cfg.get("set_filters", False)))
+    parser.add_argument("--i2c-rdwr", action="store_true", default=_coerce_bool(cfg.get("i2c_rdwr", False)),
+                        help="Read registers with one combined I2C_RDWR transfer (adapter must support it).")
 
     # optional float (supports "None" string)
     parser.add_argument(
@@ -181,7 +246,7 @@ def main():
     ensure_dir(args.data_dir)
 
     # Open scale
-    scale = MiniScale(bus=args.bus, addr=addr)
+    scale = MiniScale(bus=args.bus, addr=addr, use_rdwr=args.i2c_rdwr)
 
     # Optional: configure GAP and filters
     if args.gap is not None:
@@ -205,88 +270,114 @@ def main():
         try:
             print("Taring unit (reset offset)…")
             scale.tare()
-            time.sleep(0.2)
+            if not scale.wait_stable():
+                print("[WARN] weight did not settle near 0 g after tare")
         except Exception as e:
             print(f"[WARN] tare on start failed: {e}")
 
-    # Prepare CSV
-    current_path = today_path(args.data_dir, args.name)
-    fp = open(current_path, "a+", newline="")
-    writer = csv.writer(fp)
-    ensure_header(fp, writer)
+    # Prepare log file
+    log_ext = "bin" if args.binary else "csv"
+    current_day = datetime.now().date()
+    current_path = today_path(args.data_dir, args.name, current_day, log_ext)
+    bin_buffer = bin_buffer_size(args.interval, args.flush_interval)
+    fp = open_log(current_path, args.binary, bin_buffer)
 
-    # Button tare state
-    prev_pressed = False
+    # CSV rows are buffered and written in batches to cut per-sample write/flush syscalls
+    # (binary records go straight into the file's buffer, sized to one flush interval)
+    pending = []
+    last_flush = time.monotonic()
+
+    # Button-triggered tare (always active): polled on a background thread
+    tare_requested = threading.Event()
+    btn_stop = threading.Event()
+    btn_thread = threading.Thread(target=button_loop, args=(scale, tare_requested, btn_stop), daemon=True)
+    btn_thread.start()
 
     try:
-        last_sample_time = 0.0
+        # Deadline scheduling on the monotonic clock: sample time does not drift with
+        # I2C/IO latency.
+        next_sample = time.monotonic()
+        # Timestamp and text fields are only formatted when something will use them
+        need_ts = args.print or not args.binary
+        unit_sign = args.sign in (1.0, -1.0)
         while not _stop:
+            # One clock read per tick for the record, the CSV/print timestamp and day rotation
+            t_ns = time.time_ns()
+            now = datetime.fromtimestamp(t_ns / 1e9)
+            ts = now.isoformat() if need_ts else ""
+
             # rotate at midnight
-            new_path = today_path(args.data_dir, args.name)
-            if new_path != current_path:
+            if now.date() != current_day:
+                current_day = now.date()
+                if pending:
+                    fp.write("".join(pending))
+                    pending.clear()
                 fp.close()
-                current_path = new_path
-                fp = open(current_path, "a+", newline="")
-                writer = csv.writer(fp)
-                ensure_header(fp, writer)
-
-            ts = datetime.now().isoformat()
+                current_path = today_path(args.data_dir, args.name, current_day, log_ext)
+                fp = open_log(current_path, args.binary, bin_buffer)
 
             # ---- Read weights ----
             try:
-                # get_weight_float() -> grams (float32 from 0x10)
-                g_f32 = scale.get_weight_float() * args.sign
-                # get_weight_int() -> grams (int/100 from 0x60, already divided inside driver)
-                g_i = scale.get_weight_int() * args.sign
-                adc = scale.get_raw_adc()
+                # one bundled read: raw ADC + float32 grams (0x00..0x13), int grams*100 (0x60)
+                adc, g_f32, x100 = scale.read_sample_bundle()
+                g_f32 *= args.sign
+                g_i = x100 * args.sign / 100.0
+                # Whole centigrams (exact when sign is +/-1)
+                x100 = round(x100 * args.sign)
             except Exception as e:
                 print(f"[WARN] read failed: {e}")
                 g_f32 = float("nan")
                 g_i = float("nan")
+                x100 = None
                 adc = -1
 
-            writer.writerow([ts, f"{g_f32:.3f}", f"{g_i:.3f}", adc])
-            fp.flush()
+            if need_ts:
+                s_f32 = _fmt3(g_f32)
+                # Integer formatting only when the sign keeps whole centigrams
+                s_x100 = format_cents(x100) if unit_sign and x100 is not None else _fmt3(g_i)
+
+            if args.binary:
+                fp.write(BIN_RECORD.pack(t_ns, g_f32, X100_MISSING if x100 is None else x100, adc))
+            else:
+                pending.append(f"{ts},{s_f32},{s_x100},{adc}\n")
+            if time.monotonic() - last_flush >= args.flush_interval:
+                if pending:
+                    fp.write("".join(pending))
+                    pending.clear()
+                fp.flush()
+                last_flush = time.monotonic()
 
             if args.print:
-                print(f"{ts}  {g_f32:.3f} g (x100:{g_i:.3f} g)  adc:{adc}")
-
-            # ---- Button-triggered tare (always active) ----
-            # Poll the button at a faster cadence than the sample interval
-            now = time.time()
-            if now - last_sample_time >= BTN_SAMPLE_SECS:
-                last_sample_time = now
-                try:
-                    pressed = scale.get_button_pressed()  # True if pressed
-                except Exception:
-                    pressed = False
-
-                # Rising edge: pressed now, not pressed before
-                if pressed and not prev_pressed:
+                print(f"{ts}  {s_f32} g (x100:{s_x100} g)  adc:{adc}")
+
+            next_sample += args.interval
+            # If we fell behind, skip missed slots instead of bursting
+            if next_sample < time.monotonic():
+                next_sample = time.monotonic() + args.interval
+
+            # Sleep until the next sample, handling button tares as soon as they are requested
+            while not _stop:
+                remaining = next_sample - time.monotonic()
+                if remaining <= 0:
+                    break
+                if tare_requested.wait(remaining):
+                    tare_requested.clear()
                     try:
                         scale.tare()
                         if args.print:
                             print(f"{datetime.now().isoformat()}  [INFO] Button press detected -> tare()")
-                        time.sleep(BTN_AFTER_TARE_SLEEP)
-                        if BTN_WAIT_RELEASE:
-                            # Wait until user releases the button before allowing another tare
-                            while True:
-                                try:
-                                    if not scale.get_button_pressed():
-                                        break
-                                except Exception:
-                                    break
-                                time.sleep(BTN_SAMPLE_SECS)
                     except Exception as e:
                         print(f"[WARN] button-tare failed: {e}")
-
-                prev_pressed = pressed
-
-            # Sleep until next reading (but keep the loop responsive for button checks)
-            time.sleep(max(0.0, args.interval - BTN_SAMPLE_SECS))
     finally:
-        fp.close()
-        scale.close()
+        btn_stop.set()
+        btn_thread.join(timeout=1.0)
+        try:
+            # Write out anything still buffered; close() flushes it (no-op if rotation left fp closed)
+            if pending and not fp.closed:
+                fp.write("".join(pending))
+            fp.close()
+        finally:
+            scale.close()
 
 
 if __name__ == "__main__":
@@ -22,7 +22,8 @@ def maybe_calibrate(scale: MiniScale):
         return
     print("Taring unit (reset offset)...")
     scale.tare()
-    time.sleep(0.3)
+    if not scale.wait_stable():
+        print("[WARN] weight did not settle near 0 g after tare")
 
     adc0 = scale.get_raw_adc()
     print(f"adc @ 0 g : {adc0}")
@@ -58,7 +59,8 @@ def main():
 
         print("Taring unit (reset offset)…")
         scale.tare()
-        time.sleep(0.3)
+        if not scale.wait_stable():
+            print("[WARN] weight did not settle near 0 g after tare")
 
         maybe_calibrate(scale)
 
@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("smbus2")
+
+from m5stack_mini_scale import MiniScale
+
+
+def test_gap_batch_matches_scalar_formula():
+    gap = MiniScale.compute_gap_from_points_batch([1000, 1000], [800, 600], [2.0, 4.0])
+    assert gap == pytest.approx(100.0)
+
+
+def test_gap_batch_rejects_outlier_when_mad_is_zero():
+    # per-point gaps: 100, 100, 100, 5000 -> median 100, MAD 0
+    adc0 = [0, 0, 0, 0]
+    adcw = [-100, -200, -300, -20000]
+    w = [1.0, 2.0, 3.0, 4.0]
+    assert MiniScale.compute_gap_from_points_batch(adc0, adcw, w) == pytest.approx(100.0)
+
+
+def test_gap_batch_rejects_zero_weight():
+    with pytest.raises(ValueError):
+        MiniScale.compute_gap_from_points_batch([0], [1], [0.0])
+
+
+def _stub_scale(readings):
+    scale = MiniScale.__new__(MiniScale)
+    it = iter(readings)
+    last = [None]
+
+    def get_weight_x100():
+        last[0] = next(it, last[0])
+        return last[0]
+
+    scale.get_weight_x100 = get_weight_x100
+    return scale
+
+
+def test_wait_stable_returns_early_on_small_steady_offset():
+    scale = _stub_scale([300, 40, -7, -7])
+    assert scale.wait_stable(poll=0.0) is True
+
+
+def test_wait_stable_times_out_while_drifting():
+    scale = _stub_scale(range(0, 10000, 10))
+    assert scale.wait_stable(timeout=0.05, poll=0.001) is False